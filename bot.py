@@ -1,51 +1,41 @@
+import asyncio
 import discord
+from collections import defaultdict
 from discord.ext import commands
 from discord.ui import Select, View, Button
-import sqlite3
-import pytz
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta, timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 import os
+from time import monotonic
 from database import DatabaseManager, init_db
 from tenacity import retry, stop_after_attempt, wait_exponential
 
 TOKEN = os.getenv("DISCORD_BOT_TOKEN")
-DB_PATH = "scrim_bot.db"
+DB_PATH = os.getenv("SCRIM_BOT_DB", "scrim_bot.db")
+try:
+    KST = ZoneInfo("Asia/Seoul")
+except ZoneInfoNotFoundError:
+    # Windows ships no zone data unless tzdata is installed; Korea has kept UTC+9 without DST since 1988
+    KST = timezone(timedelta(hours=9), "KST")
+MAX_TEAMS_PER_SCRIM = 12
+MAX_MEMBERS_PER_TEAM = 5
+
+NUMBER_EMOJIS = ("0️⃣", "1️⃣", "2️⃣", "3️⃣", "4️⃣", "5️⃣", "6️⃣", "7️⃣", "8️⃣", "9️⃣")
+PARTICIPANT_EMOJIS = ("1️⃣", "2️⃣", "3️⃣", "4️⃣", "5️⃣", "6️⃣", "7️⃣", "8️⃣", "9️⃣", "🔟", "1️⃣1️⃣", "1️⃣2️⃣")
+# Keycap labels for list positions; embeds cap out at 25 fields, well inside this range
+INDEX_EMOJI = [''.join(NUMBER_EMOJIS[int(digit)] for digit in str(i)) for i in range(100)]
 
 # Initialize database
 db = DatabaseManager(DB_PATH)
 
-# --- Database Setup ---
-conn = sqlite3.connect("scrim_bot.db")
-cursor = conn.cursor()
-cursor.execute("""
-CREATE TABLE IF NOT EXISTS scrims (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    time_period TEXT UNIQUE
-)
-""")
-cursor.execute("""
-CREATE TABLE IF NOT EXISTS teams (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    team_name TEXT,
-    scrim_time TEXT,
-    leader_id INTEGER,
-    FOREIGN KEY (leader_id) REFERENCES members(id)
-)
-""")
-cursor.execute("""
-CREATE TABLE IF NOT EXISTS members (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    team_id INTEGER,
-    member_name TEXT,
-    FOREIGN KEY (team_id) REFERENCES teams(id)
-)
-""")
-# Add indexes for optimization
-cursor.execute("CREATE INDEX IF NOT EXISTS idx_scrims_time_period ON scrims(time_period)")
-cursor.execute("CREATE INDEX IF NOT EXISTS idx_teams_team_name ON teams(team_name)")
-cursor.execute("CREATE INDEX IF NOT EXISTS idx_teams_scrim_time ON teams(scrim_time)")
-cursor.execute("CREATE INDEX IF NOT EXISTS idx_members_member_name ON members(member_name)")
-conn.commit()
+# guild id -> {role name: role id}; dropped whenever a role in that guild changes or the bot reconnects
+_role_cache = defaultdict(dict)
+
+PARTICIPANTS_TTL = 60  # seconds
+# scrim date -> (monotonic fetch time, team names); writes to team_scrims drop the affected days
+_participants_cache = {}
+# Bumped on every invalidation so a lookup that started earlier doesn't store its stale result
+_participants_generation = 0
 
 # --- Bot Setup ---
 intents = discord.Intents.default()
@@ -53,7 +43,18 @@ intents.messages = True
 intents.members = True  # Enable the members intent
 intents.message_content = True
 intents.guilds = True
-bot = commands.Bot(command_prefix="!", intents=intents, application_id="1372785675107045447")
+class ScrimBot(commands.Bot):
+    async def setup_hook(self):
+        # Runs once before the gateway connects; on_ready fires again on every reconnect
+        await init_db(DB_PATH)
+        await db.connect()
+        await db.execute("ANALYZE")  # give the query planner statistics for the indexes init_db creates
+
+    async def close(self):
+        await super().close()
+        await db.close()
+
+bot = ScrimBot(command_prefix="!", intents=intents, application_id="1372785675107045447")
 
 # --- Helper Functions ---
 @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=4, max=10))
@@ -66,45 +67,88 @@ async def safe_discord_operation(operation, *args, **kwargs):
             raise  # Let retry handle it
         raise
 
+async def strip_team_role(member, role, team_name, limiter):
+    """Remove a team's role and nickname prefix from one member"""
+    async with limiter:
+        await safe_discord_operation(member.remove_roles, role)
+        if member.nick and member.nick.startswith(f"{team_name} "):
+            original_nick = member.nick.split(' ', 1)[-1]
+            await safe_discord_operation(member.edit, nick=original_nick)
+
+def get_role(guild, name):
+    """Look up a guild role by name, indexing the guild's roles on first use"""
+    role_ids = _role_cache[guild.id]
+    if not role_ids:
+        for role in guild.roles:
+            role_ids.setdefault(role.name, role.id)  # first match wins, like discord.utils.get
+    # Resolve through the live guild so a reconnect never hands back a stale Role
+    role_id = role_ids.get(name)
+    return guild.get_role(role_id) if role_id is not None else None
+
 async def get_scrim_times():
     return await db.fetch_all("SELECT time_period FROM scrims")
 
 async def add_scrim_time(time_period):
     try:
-        async with db.transaction() as cursor:
-            await cursor.execute("INSERT INTO scrims (time_period) VALUES (?)", (time_period,))
+        async with db.transaction() as conn:
+            await conn.execute("INSERT INTO scrims (time_period) VALUES (?)", (time_period,))
         return True
     except Exception:
         return False
 
-async def add_team(team_name, scrim_time, leader_id):
-    async with db.transaction() as cursor:
-        await cursor.execute(
-            "INSERT INTO teams (team_name, scrim_time, leader_id) VALUES (?, ?, ?)",
-            (team_name, scrim_time, leader_id)
+async def add_team(team_name, leader_id):
+    async with db.transaction() as conn:
+        cursor = await conn.execute(
+            "INSERT INTO teams (team_name, leader_id) VALUES (?, ?)",
+            (team_name, leader_id)
         )
         return cursor.lastrowid
 
 async def get_teams(scrim_time):
-    results = await db.fetch_all("SELECT team_name FROM teams WHERE scrim_time = ?", (scrim_time,))
-    return [row['team_name'] for row in results]
+    return await db.fetch_column(
+        "SELECT t.team_name FROM team_scrims s JOIN teams t ON t.id = s.team_id WHERE s.scrim_time = ?",
+        (scrim_time,)
+    )
+
+async def get_participants(scrim_date):
+    """Return the teams signed up for a day, reusing a recent lookup when there is one"""
+    cached = _participants_cache.get(scrim_date)
+    if cached and monotonic() - cached[0] < PARTICIPANTS_TTL:
+        return cached[1]
+    generation = _participants_generation
+    teams = await get_teams(scrim_date)
+    if generation == _participants_generation:
+        # Only the 7-day window is ever shown, so days that have fallen out of it go
+        window = get_scrim_days()
+        for day in [day for day in _participants_cache if day not in window]:
+            del _participants_cache[day]
+        _participants_cache[scrim_date] = (monotonic(), teams)
+    return teams
+
+def invalidate_participants(scrim_date=None):
+    """Drop the cached teams for one day, or for every day; call after the write commits"""
+    global _participants_generation
+    _participants_generation += 1
+    if scrim_date is None:
+        _participants_cache.clear()
+    else:
+        _participants_cache.pop(scrim_date, None)
 
 async def add_team_member(team_id, member_name):
-    async with db.transaction() as cursor:
-        # Check if team exists and has space
-        await cursor.execute("SELECT COUNT(*) as count FROM members WHERE team_id = ?", (team_id,))
-        result = await cursor.fetchone()
-        if result['count'] < 5:  # Assuming max 5 members per team
-            await cursor.execute(
-                "INSERT INTO members (team_id, member_name) VALUES (?, ?)",
-                (team_id, member_name)
-            )
-            return True
-        return False
+    async with db.transaction() as conn:
+        # Inserts nothing once the team is full
+        cursor = await conn.execute(
+            """
+            INSERT INTO members (team_id, member_name)
+            SELECT ?, ?
+            WHERE (SELECT COUNT(*) FROM members WHERE team_id = ?) < ?
+            """,
+            (team_id, member_name, team_id, MAX_MEMBERS_PER_TEAM)
+        )
+        return cursor.rowcount == 1
 
 async def get_team_members(team_id):
-    results = await db.fetch_all("SELECT member_name FROM members WHERE team_id = ?", (team_id,))
-    return [row['member_name'] for row in results]
+    return await db.fetch_column("SELECT member_name FROM members WHERE team_id = ?", (team_id,))
 
 async def get_team_id(team_name):
     result = await db.fetch_one("SELECT id FROM teams WHERE team_name = ?", (team_name,))
@@ -114,12 +158,27 @@ async def get_team_id(team_name):
 
 def get_current_week_period():
     """Calculate the start and end dates of the current week."""
-    korean_tz = pytz.timezone('Asia/Seoul')
-    today = datetime.now(korean_tz)
+    today = datetime.now(KST)
     start_date = today - timedelta(days=today.weekday())  # Start of the week (Monday)
     end_date = start_date + timedelta(days=6)  # End of the week (Sunday)
     return start_date.strftime('%d %B'), end_date.strftime('%d %B')
 
+EPOCH = date(1970, 1, 1)
+_scrim_days_cache = (None, ())
+
+def get_scrim_days():
+    """Return the next 7 days as day numbers since the epoch, rebuilt only when the KST date changes."""
+    global _scrim_days_cache
+    today = datetime.now(KST).date()
+    if _scrim_days_cache[0] != today:
+        first_day = (today - EPOCH).days
+        _scrim_days_cache = (today, tuple(range(first_day, first_day + 7)))
+    return _scrim_days_cache[1]
+
+def format_scrim_day(day):
+    """Render a stored scrim day number as 'DD/MM'"""
+    return (EPOCH + timedelta(days=day)).strftime('%d/%m')
+
 def create_info_embed(title, description, color=discord.Color.blue()):
     """Create a standard info embed with consistent styling"""
     embed = discord.Embed(
@@ -158,13 +217,36 @@ def create_schedule_embed(team_name, scrim_times):
     embed.set_footer(text="SV Bot | Schedule Management")
     return embed
 
+MENU_EMBED = discord.Embed(
+    title="🎮 SV Bot Menu",
+    description="Welcome to SV Bot! Select an option below:",
+    color=discord.Color.blue()
+)
+MENU_EMBED.add_field(name="Team Management", value="• List Teams\n• Create Team\n• Join Team\n• Check Teams\n• Quit Team\n• Discard Team", inline=True)
+MENU_EMBED.add_field(name="Scrim Management", value="• Scrim Signup\n• Cancel Sign Up\n• Check Schedule", inline=True)
+MENU_EMBED.add_field(name="Admin", value="• Reset Database", inline=True)
+MENU_EMBED.set_footer(text="SV Bot | Main Menu")
+
 # --- Sync Commands ---
 @bot.event
 async def on_ready():
-    await init_db(DB_PATH)
+    # A full reconnect rebuilds the guilds, and role changes made while offline sent no events
+    _role_cache.clear()
     await bot.tree.sync()
     print(f"Bot is logged in as {bot.user}")
 
+@bot.event
+async def on_guild_role_create(role):
+    _role_cache.pop(role.guild.id, None)
+
+@bot.event
+async def on_guild_role_update(before, after):
+    _role_cache.pop(after.guild.id, None)
+
+@bot.event
+async def on_guild_role_delete(role):
+    _role_cache.pop(role.guild.id, None)
+
 # --- Menu View ---
 class MenuView(View):
     def __init__(self):
@@ -197,131 +279,113 @@ class ScrimView(View):
         self.add_item(Button(label="Check Schedule", style=discord.ButtonStyle.secondary, custom_id="check_schedule"))
         self.add_item(Button(label="Back to Menu", style=discord.ButtonStyle.secondary, custom_id="back_to_menu"))
 
+class CreateTeamModal(discord.ui.Modal, title="Create Team"):
+    team_name = discord.ui.TextInput(label="Team name (3 characters max)", min_length=1, max_length=3)
+
+    async def on_submit(self, interaction: discord.Interaction):
+        await submit_team_logic(interaction, self.team_name.value)
+
+# The menu views are stateless and never time out, so one instance of each is reused.
+# They are built on first use because View() needs a running event loop.
+_shared_views = {}
+
+def shared_view(view_cls):
+    """Return the shared instance of a stateless menu view"""
+    if view_cls not in _shared_views:
+        _shared_views[view_cls] = view_cls()
+    return _shared_views[view_cls]
+
 # --- Interaction Handlers ---
 @bot.event
 async def on_interaction(interaction: discord.Interaction):
     if interaction.type == discord.InteractionType.component:
         custom_id = interaction.data.get("custom_id")
 
-        if custom_id == "list_teams":
+        handler = HANDLERS.get(custom_id)
+        if handler:
+            await handler(interaction)
+        elif custom_id == "list_teams":
             scrim_time = "21:00"  # Replace with the desired scrim time
             await list_teams_logic(interaction, scrim_time)
-        elif custom_id == "reset_database":
-            await reset_database_logic(interaction)
-        elif custom_id == "create_team":
-            await create_team_logic(interaction)
-        elif custom_id == "join_team":
-            await join_team_logic(interaction)
-        elif custom_id == "check_teams":
-            await check_teams_logic(interaction)
-        elif custom_id == "quit_team":
-            await quit_team_logic(interaction)
-        elif custom_id == "scrim_signup":
-            await scrim_signup_logic(interaction)
-        elif custom_id == "cancel_sign_up":
-            await cancel_sign_up_logic(interaction)
-        elif custom_id == "check_schedule":
-            await check_schedule_logic(interaction)
-        elif custom_id == "discard_team":
-            await discard_team_logic(interaction)
-        elif custom_id == "participants":
-            await participants_logic(interaction)
-        elif custom_id.startswith("participants_prev_") or custom_id.startswith("participants_next_"):
+        elif custom_id.startswith(("participants_prev_", "participants_next_")):
             day_offset = int(custom_id.split("_")[-1])
             await participants_logic(interaction, day_offset)
-        elif custom_id == "category_team":
-            view = TeamView()
-            await interaction.response.edit_message(content="Team Management", embed=None, view=view)
-        elif custom_id == "category_scrim":
-            view = ScrimView()
-            await interaction.response.edit_message(content="Scrim Management", embed=None, view=view)
-        elif custom_id == "back_to_menu":
-            embed = discord.Embed(
-                title="🎮 SV Bot Menu",
-                description="Welcome to SV Bot! Select an option below:",
-                color=discord.Color.blue(),
-                timestamp=datetime.now()
-            )
-            embed.add_field(name="Team Management", value="• List Teams\n• Create Team\n• Join Team\n• Check Teams\n• Quit Team\n• Discard Team", inline=True)
-            embed.add_field(name="Scrim Management", value="• Scrim Signup\n• Cancel Sign Up\n• Check Schedule", inline=True)
-            embed.add_field(name="Admin", value="• Reset Database", inline=True)
-            embed.set_footer(text="SV Bot | Main Menu")
-            view = MenuView()
-            await interaction.response.edit_message(embed=embed, view=view)
 
 # --- Commands ---
 @bot.tree.command(name="menu")
 async def menu(interaction: discord.Interaction):
     """Command to display the interaction menu"""
-    embed = discord.Embed(
-        title="🎮 SV Bot Menu",
-        description="Welcome to SV Bot! Select an option below:",
-        color=discord.Color.blue(),
-        timestamp=datetime.now()
-    )
-    
-    embed.add_field(name="Team Management", value="• List Teams\n• Create Team\n• Join Team\n• Check Teams\n• Quit Team\n• Discard Team", inline=True)
-    embed.add_field(name="Scrim Management", value="• Scrim Signup\n• Cancel Sign Up\n• Check Schedule", inline=True)
-    embed.add_field(name="Admin", value="• Reset Database", inline=True)
-    
-    embed.set_footer(text="SV Bot | Main Menu")
-    view = MenuView()
-    await interaction.response.send_message(embed=embed, view=view, ephemeral=True)
+    await interaction.response.send_message(embed=MENU_EMBED, view=shared_view(MenuView), ephemeral=True)
 
 # --- Logic Functions ---
 async def list_teams_logic(interaction: discord.Interaction, scrim_time: str):
     """Logic to list all teams registered for a specific scrim time"""
-    teams = get_teams(scrim_time)
+    await interaction.response.defer(ephemeral=True, thinking=True)
+    rows = await db.fetch_all("""
+        SELECT t.team_name, m.member_name
+        FROM team_scrims s
+        JOIN teams t ON t.id = s.team_id
+        LEFT JOIN members m ON m.team_id = t.id
+        WHERE s.scrim_time = ?
+        ORDER BY t.id
+    """, (scrim_time,))
+    teams = {}
+    for row in rows:
+        members = teams.setdefault(row['team_name'], [])
+        if row['member_name'] is not None:
+            members.append(row['member_name'])
     if teams:
-        teams_data = []
-        for team_name in teams:
-            team_id = get_team_id(team_name)
-            members = get_team_members(team_id)
-            teams_data.append({"name": team_name, "members": ", ".join(members) if members else "No members"})
+        teams_data = [
+            {"name": team_name, "members": ", ".join(members) if members else "No members"}
+            for team_name, members in teams.items()
+        ]
         embed = create_team_list_embed(teams_data)
-        await interaction.response.send_message(embed=embed, ephemeral=True)
+        await interaction.followup.send(embed=embed, ephemeral=True)
     else:
         embed = create_info_embed("No Teams", f"No teams registered for {scrim_time}.", discord.Color.orange())
-        await interaction.response.send_message(embed=embed, ephemeral=True)
+        await interaction.followup.send(embed=embed, ephemeral=True)
 
 async def reset_database_logic(interaction: discord.Interaction):
     """Logic to reset the database to empty"""
+    await interaction.response.defer(ephemeral=True, thinking=True)
     try:
-        cursor.execute("DELETE FROM scrims")
-        cursor.execute("DELETE FROM teams")
-        cursor.execute("DELETE FROM members")
-        conn.commit()
+        await db.execute_script("""
+            DELETE FROM members;
+            DELETE FROM team_scrims;
+            DELETE FROM teams;
+            DELETE FROM scrims;
+            DELETE FROM sqlite_sequence WHERE name IN ('members', 'teams');
+        """)
+        invalidate_participants()
         embed = create_info_embed("Database Reset", "Database has been reset successfully!", discord.Color.green())
-        await interaction.response.send_message(embed=embed, ephemeral=True)
+        await interaction.followup.send(embed=embed, ephemeral=True)
     except Exception as e:
         embed = create_info_embed("Error", f"Failed to reset database: {e}", discord.Color.red())
-        await interaction.response.send_message(embed=embed, ephemeral=True)
+        await interaction.followup.send(embed=embed, ephemeral=True)
 
 async def create_team_logic(interaction: discord.Interaction):
     """Logic to create a new team and assign the Team leader role"""
     leader_id = interaction.user.id
-    cursor.execute("SELECT team_name FROM teams WHERE leader_id = ?", (leader_id,))
-    if cursor.fetchone() is not None:
+    if await db.fetch_one("SELECT team_name FROM teams WHERE leader_id = ?", (leader_id,)) is not None:
         embed = create_info_embed("Error", "You are already a Team leader and cannot create another team.", discord.Color.red())
         await interaction.response.send_message(embed=embed, ephemeral=True)
         return
 
-    embed = create_info_embed("Create Team", "Please enter your team name (3 characters max):", discord.Color.blue())
-    await interaction.response.send_message(embed=embed, ephemeral=True)
-
-    def check(msg):
-        return msg.author == interaction.user and len(msg.content) <= 3
+    await interaction.response.send_modal(CreateTeamModal())
 
+async def submit_team_logic(interaction: discord.Interaction, team_name: str):
+    """Logic to register the team name entered in the Create Team modal"""
+    await interaction.response.defer(ephemeral=True, thinking=True)
+    leader_id = interaction.user.id
+    team_name = team_name.upper()
     try:
-        team_msg = await bot.wait_for("message", check=check, timeout=60)
-        team_name = team_msg.content.upper()
-        if get_team_id(team_name) is not None:
+        if await get_team_id(team_name) is not None:
             embed = create_info_embed("Error", "This team name is already taken. Please choose a different name.", discord.Color.red())
             await interaction.followup.send(embed=embed, ephemeral=True)
             return
         
-        add_team(team_name, "", leader_id)
-        role = discord.utils.get(interaction.guild.roles, name="Team leader")
+        await add_team(team_name, leader_id)
+        role = get_role(interaction.guild, "Team leader")
         await interaction.user.add_roles(role)
         await interaction.user.edit(nick=f"{team_name} {interaction.user.display_name}(C)")
         
@@ -336,32 +400,38 @@ async def create_team_logic(interaction: discord.Interaction):
 
 async def join_team_logic(interaction: discord.Interaction):
     """Logic to join a team by selecting from a list and assign a role"""
+    await interaction.response.defer(ephemeral=True, thinking=True)
     leader_id = interaction.user.id
-    cursor.execute("SELECT team_name FROM teams WHERE leader_id = ?", (leader_id,))
-    if cursor.fetchone() is not None:
-        embed = create_info_embed("Error", "Team leaders cannot join another team.", discord.Color.red())
-        await interaction.response.send_message(embed=embed, ephemeral=True)
-        return
-
-    cursor.execute("SELECT team_id FROM members WHERE member_name = ?", (interaction.user.display_name,))
-    if cursor.fetchone() is not None:
-        embed = create_info_embed("Error", "You are already a member of a team.", discord.Color.red())
-        await interaction.response.send_message(embed=embed, ephemeral=True)
+    # Leader rows come first in the UNION, so a leader gets the leader message
+    existing = await db.fetch_one(
+        """
+        SELECT 'leader' AS kind FROM teams WHERE leader_id = ?
+        UNION ALL
+        SELECT 'member' FROM members WHERE member_name = ?
+        LIMIT 1
+        """,
+        (leader_id, interaction.user.display_name)
+    )
+    if existing is not None:
+        if existing['kind'] == 'leader':
+            embed = create_info_embed("Error", "Team leaders cannot join another team.", discord.Color.red())
+        else:
+            embed = create_info_embed("Error", "You are already a member of a team.", discord.Color.red())
+        await interaction.followup.send(embed=embed, ephemeral=True)
         return
 
-    cursor.execute("SELECT team_name FROM teams")
-    team_names = [row[0] for row in cursor.fetchall()]
-    if not team_names:
+    options = [discord.SelectOption(label=row['team_name']) async for row in db.fetch_iter("SELECT team_name FROM teams")]
+    if not options:
         embed = create_info_embed("No Teams Available", "There are currently no teams available to join.", discord.Color.orange())
-        await interaction.response.send_message(embed=embed, ephemeral=True)
+        await interaction.followup.send(embed=embed, ephemeral=True)
         return
 
-    options = [discord.SelectOption(label=team) for team in team_names]
     select = Select(placeholder="Select a team to join", options=options)
 
     async def select_callback(interaction):
+        await interaction.response.defer()
         selected_team = select.values[0]
-        role = discord.utils.get(interaction.guild.roles, name=selected_team)
+        role = get_role(interaction.guild, selected_team)
         if not role:
             role = await interaction.guild.create_role(name=selected_team)
         await interaction.user.add_roles(role)
@@ -369,19 +439,29 @@ async def join_team_logic(interaction: discord.Interaction):
         embed = create_info_embed("Success", f"You have joined the team '{selected_team}'.", discord.Color.green())
         view = View()
         view.add_item(Button(label="Back to Menu", style=discord.ButtonStyle.secondary, custom_id="back_to_menu"))
-        await interaction.response.edit_message(embed=embed, view=view)
+        await interaction.edit_original_response(embed=embed, view=view)
 
     select.callback = select_callback
     view = View()
     view.add_item(select)
     
     embed = create_info_embed("Join Team", "Select a team to join:", discord.Color.blue())
-    await interaction.response.send_message(embed=embed, view=view, ephemeral=True)
+    await interaction.followup.send(embed=embed, view=view, ephemeral=True)
 
 async def check_teams_logic(interaction: discord.Interaction):
     """Logic to check all teams and their members"""
-    cursor.execute("SELECT team_name, leader_id FROM teams")
-    teams = cursor.fetchall()
+    await interaction.response.defer(ephemeral=True, thinking=True)
+    rows = await db.fetch_all("""
+        SELECT t.team_name, t.leader_id, m.member_name
+        FROM teams t
+        LEFT JOIN members m ON m.team_id = t.id
+        ORDER BY t.id
+    """)
+    teams = {}
+    for row in rows:
+        team = teams.setdefault(row['team_name'], {"leader_id": row['leader_id'], "members": []})
+        if row['member_name'] is not None:
+            team["members"].append(row['member_name'])
     if teams:
         embed = discord.Embed(
             title="📋 Teams and Members",
@@ -389,46 +469,38 @@ async def check_teams_logic(interaction: discord.Interaction):
             timestamp=datetime.now()
         )
         
-        number_emojis = ["0️⃣", "1️⃣", "2️⃣", "3️⃣", "4️⃣", "5️⃣", "6️⃣", "7️⃣", "8️⃣", "9️⃣"]
-        for index, team in enumerate(teams, start=1):
-            team_name, leader_id = team
-            member = interaction.guild.get_member(leader_id)
+        for index, (team_name, team) in enumerate(teams.items(), start=1):
+            member = interaction.guild.get_member(team["leader_id"])
             if member:
-                leader_name = member.display_name
-                if leader_name.startswith(f"{team_name} "):
-                    leader_name = leader_name[len(team_name) + 1:].strip()
-                if leader_name.endswith("(C)"):
-                    leader_name = leader_name[:-3].strip()
-                leader_name += " (C)"
+                leader_name = member.display_name.removeprefix(f"{team_name} ").strip()
+                leader_name = leader_name.removesuffix("(C)").strip() + " (C)"
             else:
                 leader_name = "(Leader not found)"
 
-            team_id = get_team_id(team_name)
-            members = get_team_members(team_id)
-            member_names = ", ".join([name for name in members if name != leader_name])
+            member_names = ", ".join([name for name in team["members"] if name != leader_name])
             
-            index_str = ''.join(number_emojis[int(digit)] for digit in str(index))
             embed.add_field(
-                name=f"{index_str} {team_name}",
+                name=f"{INDEX_EMOJI[index]} {team_name}",
                 value=f"👥 Members: {leader_name}, {member_names}",
                 inline=False
             )
         
         embed.set_footer(text="SV Bot | Team List")
-        await interaction.response.send_message(embed=embed, ephemeral=True)
+        await interaction.followup.send(embed=embed, ephemeral=True)
     else:
         embed = create_info_embed("No Teams", "No teams found.", discord.Color.orange())
-        await interaction.response.send_message(embed=embed, ephemeral=True)
+        await interaction.followup.send(embed=embed, ephemeral=True)
 
 async def quit_team_logic(interaction: discord.Interaction):
     """Logic to quit a team and remove the role"""
-    cursor.execute("SELECT team_name FROM teams WHERE leader_id = ?", (interaction.user.id,))
-    if cursor.fetchone() is not None:
+    await interaction.response.defer(ephemeral=True, thinking=True)
+    if await db.fetch_one("SELECT team_name FROM teams WHERE leader_id = ?", (interaction.user.id,)) is not None:
         embed = create_info_embed("Error", "Team leaders cannot quit their own team.", discord.Color.red())
-        await interaction.response.send_message(embed=embed, ephemeral=True)
+        await interaction.followup.send(embed=embed, ephemeral=True)
         return
 
-    team_roles = [role for role in interaction.user.roles if role.name in [row[0] for row in cursor.execute("SELECT team_name FROM teams")]]
+    team_names = {row['team_name'] for row in await db.fetch_all("SELECT team_name FROM teams")}
+    team_roles = [role for role in interaction.user.roles if role.name in team_names]
     if team_roles:
         for role in team_roles:
             await interaction.user.remove_roles(role)
@@ -436,44 +508,41 @@ async def quit_team_logic(interaction: discord.Interaction):
                 original_nick = interaction.user.nick.split(' - ', 1)[-1]
                 await interaction.user.edit(nick=original_nick)
         embed = create_info_embed("Success", "You have quit the team.", discord.Color.green())
-        await interaction.response.send_message(embed=embed, ephemeral=True)
+        await interaction.followup.send(embed=embed, ephemeral=True)
     else:
         embed = create_info_embed("Error", "You are not part of any team.", discord.Color.red())
-        await interaction.response.send_message(embed=embed, ephemeral=True)
+        await interaction.followup.send(embed=embed, ephemeral=True)
 
 async def scrim_signup_logic(interaction: discord.Interaction):
     """Logic to sign up for scrims for the week with proper concurrency handling"""
-    korean_tz = pytz.timezone('Asia/Seoul')
-    start_date = datetime.now(korean_tz)
-    days_of_week = [(start_date + timedelta(days=i)).strftime('%d/%m') for i in range(7)]
+    await interaction.response.defer(ephemeral=True, thinking=True)
+    days_of_week = get_scrim_days()
     
     leader_id = interaction.user.id
-    team = await db.fetch_one("SELECT team_name FROM teams WHERE leader_id = ?", (leader_id,))
+    team = await db.fetch_one("SELECT id FROM teams WHERE leader_id = ?", (leader_id,))
     
     if not team:
         embed = create_info_embed("Error", "You are not a leader of any team.", discord.Color.red())
-        await interaction.response.send_message(embed=embed, ephemeral=True)
+        await interaction.followup.send(embed=embed, ephemeral=True)
         return
 
-    team_name = team['team_name']
+    team_id = team['id']
     signed_up_days = await db.fetch_all(
-        "SELECT scrim_time FROM teams WHERE team_name = ?",
-        (team_name,)
+        "SELECT scrim_time FROM team_scrims WHERE team_id = ?",
+        (team_id,)
     )
-    signed_up_days = [row['scrim_time'] for row in signed_up_days]
-
-    available_days = []
-    for day in days_of_week:
-        if day not in signed_up_days:
-            # Check team count with proper locking
-            async with db.transaction() as cursor:
-                await cursor.execute(
-                    "SELECT COUNT(*) as count FROM teams WHERE scrim_time = ?",
-                    (day,)
-                )
-                result = await cursor.fetchone()
-                if result['count'] < 12:
-                    available_days.append(day)
+    signed_up_days = {row['scrim_time'] for row in signed_up_days}
+
+    placeholders = ", ".join("?" * len(days_of_week))
+    counts = await db.fetch_all(
+        f"SELECT scrim_time, COUNT(*) AS count FROM team_scrims WHERE scrim_time IN ({placeholders}) GROUP BY scrim_time",
+        days_of_week
+    )
+    counts = {row['scrim_time']: row['count'] for row in counts}
+    available_days = [
+        day for day in days_of_week
+        if day not in signed_up_days and counts.get(day, 0) < MAX_TEAMS_PER_SCRIM
+    ]
 
     if not available_days:
         embed = create_info_embed(
@@ -481,10 +550,10 @@ async def scrim_signup_logic(interaction: discord.Interaction):
             "There are no available scrim slots for your team.",
             discord.Color.orange()
         )
-        await interaction.response.send_message(embed=embed, ephemeral=True)
+        await interaction.followup.send(embed=embed, ephemeral=True)
         return
 
-    options = [discord.SelectOption(label=day) for day in available_days]
+    options = [discord.SelectOption(label=format_scrim_day(day), value=str(day)) for day in available_days]
     select = Select(
         placeholder="Select scrim days",
         options=options,
@@ -493,7 +562,8 @@ async def scrim_signup_logic(interaction: discord.Interaction):
     )
 
     async def select_callback(interaction):
-        selected_days = select.values
+        await interaction.response.defer()
+        selected_days = [int(value) for value in select.values]
         scrim_time = "9:00 PM KST"
         embed = discord.Embed(
             title="📅 Scrim Signup Results",
@@ -501,129 +571,139 @@ async def scrim_signup_logic(interaction: discord.Interaction):
             timestamp=datetime.now()
         )
 
-        for day in selected_days:
-            async with db.transaction() as cursor:
-                # Double-check availability with proper locking
-                await cursor.execute(
-                    "SELECT COUNT(*) as count FROM teams WHERE scrim_time = ?",
-                    (day,)
+        reserved_days = []
+        async with db.transaction() as conn:
+            for day in selected_days:
+                # The capacity check rides along with the INSERT, so a full day inserts nothing
+                cursor = await conn.execute(
+                    """
+                    INSERT OR IGNORE INTO team_scrims (team_id, scrim_time)
+                    SELECT ?, ?
+                    WHERE (SELECT COUNT(*) FROM team_scrims WHERE scrim_time = ?) < ?
+                    """,
+                    (team_id, day, day, MAX_TEAMS_PER_SCRIM)
                 )
-                result = await cursor.fetchone()
-                if result['count'] < 12:
-                    await cursor.execute(
-                        "INSERT INTO teams (team_name, scrim_time, leader_id) VALUES (?, ?, ?)",
-                        (team_name, day, leader_id)
-                    )
+                if cursor.rowcount == 1:
+                    reserved_days.append(day)
                     embed.add_field(
                         name="✅ Success",
-                        value=f"Team signed up for scrim on {day} at {scrim_time}",
+                        value=f"Team signed up for scrim on {format_scrim_day(day)} at {scrim_time}",
                         inline=False
                     )
                 else:
                     embed.add_field(
                         name="❌ Failed",
-                        value=f"The scrim on '{day}' is full. Please select another day.",
+                        value=f"The scrim on '{format_scrim_day(day)}' is full. Please select another day.",
                         inline=False
                     )
 
+        for day in reserved_days:
+            invalidate_participants(day)
+
         embed.set_footer(text="SV Bot | Scrim Signup")
         view = View()
         view.add_item(Button(label="Back to Menu", style=discord.ButtonStyle.secondary, custom_id="back_to_menu"))
-        await interaction.response.edit_message(embed=embed, view=view)
+        await interaction.edit_original_response(embed=embed, view=view)
 
     select.callback = select_callback
     view = View()
     view.add_item(select)
     
     embed = create_info_embed("Scrim Signup", "Select scrim days to sign up (multiple):", discord.Color.blue())
-    await interaction.response.send_message(embed=embed, view=view, ephemeral=True)
+    await interaction.followup.send(embed=embed, view=view, ephemeral=True)
 
 async def cancel_sign_up_logic(interaction: discord.Interaction):
     """Logic to cancel specific scrim sign-up dates for a team"""
+    await interaction.response.defer(ephemeral=True, thinking=True)
     leader_id = interaction.user.id
-    cursor.execute("SELECT team_name FROM teams WHERE leader_id = ?", (leader_id,))
-    team = cursor.fetchone()
+    team = await db.fetch_one("SELECT id, team_name FROM teams WHERE leader_id = ?", (leader_id,))
     if team:
-        team_name = team[0]
-        cursor.execute("SELECT scrim_time FROM teams WHERE team_name = ?", (team_name,))
-        scrim_times = [row[0] for row in cursor.fetchall() if row[0]]
-        if scrim_times:
-            options = [discord.SelectOption(label=scrim_time[:100], value=scrim_time[:100]) for scrim_time in scrim_times]
-            select = Select(placeholder="Select scrim dates to cancel", options=options, min_values=1, max_values=len(scrim_times))
+        team_id, team_name = team['id'], team['team_name']
+        options = [
+            discord.SelectOption(label=format_scrim_day(row['scrim_time']), value=str(row['scrim_time']))
+            async for row in db.fetch_iter("SELECT scrim_time FROM team_scrims WHERE team_id = ? ORDER BY scrim_time", (team_id,))
+        ]
+        if options:
+            select = Select(placeholder="Select scrim dates to cancel", options=options, min_values=1, max_values=len(options))
 
             async def select_callback(interaction):
-                selected_dates = select.values
-                for date in selected_dates:
-                    cursor.execute("DELETE FROM teams WHERE team_name = ? AND scrim_time = ?", (team_name, date))
-                conn.commit()
-                embed = create_info_embed("Success", f"Cancelled sign-up for dates: {', '.join(selected_dates)}.", discord.Color.green())
+                await interaction.response.defer()
+                selected_dates = [int(value) for value in select.values]
+                placeholders = ", ".join("?" * len(selected_dates))
+                await db.execute(
+                    f"DELETE FROM team_scrims WHERE team_id = ? AND scrim_time IN ({placeholders})",
+                    (team_id, *selected_dates)
+                )
+                for day in selected_dates:
+                    invalidate_participants(day)
+                embed = create_info_embed("Success", f"Cancelled sign-up for dates: {', '.join(map(format_scrim_day, selected_dates))}.", discord.Color.green())
                 view = View()
                 view.add_item(Button(label="Back to Menu", style=discord.ButtonStyle.secondary, custom_id="back_to_menu"))
-                await interaction.response.edit_message(embed=embed, view=view)
+                await interaction.edit_original_response(embed=embed, view=view)
 
             select.callback = select_callback
             view = View()
             view.add_item(select)
             
             embed = create_info_embed("Cancel Signup", "Select scrim dates to cancel:", discord.Color.blue())
-            await interaction.response.send_message(embed=embed, view=view, ephemeral=True)
+            await interaction.followup.send(embed=embed, view=view, ephemeral=True)
         else:
             embed = create_info_embed("No Scrims", f"Team '{team_name}' is not signed up for any scrim schedules.", discord.Color.orange())
-            await interaction.response.send_message(embed=embed, ephemeral=True)
+            await interaction.followup.send(embed=embed, ephemeral=True)
     else:
         embed = create_info_embed("Error", "You are not a leader of any team.", discord.Color.red())
-        await interaction.response.send_message(embed=embed, ephemeral=True)
+        await interaction.followup.send(embed=embed, ephemeral=True)
 
 async def check_schedule_logic(interaction: discord.Interaction):
     """Logic to check the scrim schedule for the user's team"""
+    await interaction.response.defer(ephemeral=True, thinking=True)
     user_id = interaction.user.id
 
-    cursor.execute("SELECT team_name FROM teams WHERE leader_id = ?", (user_id,))
-    team_data = cursor.fetchone()
+    team_data = await db.fetch_one("SELECT id, team_name FROM teams WHERE leader_id = ?", (user_id,))
 
     if not team_data:
-        cursor.execute("""
-            SELECT teams.team_name
+        team_data = await db.fetch_one("""
+            SELECT teams.id, teams.team_name
             FROM teams
             INNER JOIN members ON teams.id = members.team_id
             WHERE members.member_name = ?
         """, (interaction.user.display_name,))
-        team_data = cursor.fetchone()
 
     if team_data:
-        team_name = team_data[0]
-        cursor.execute("SELECT scrim_time FROM teams WHERE team_name = ?", (team_name,))
-        scrim_times = [row[0] for row in cursor.fetchall() if row[0]]
+        team_name = team_data['team_name']
+        scrim_times = [
+            format_scrim_day(day)
+            for day in await db.fetch_column("SELECT scrim_time FROM team_scrims WHERE team_id = ? ORDER BY scrim_time", (team_data['id'],))
+        ]
         
         embed = create_schedule_embed(team_name, scrim_times)
-        await interaction.response.send_message(embed=embed, ephemeral=True)
+        await interaction.followup.send(embed=embed, ephemeral=True)
     else:
         embed = create_info_embed("Error", "You are not part of any team.", discord.Color.red())
-        await interaction.response.send_message(embed=embed, ephemeral=True)
+        await interaction.followup.send(embed=embed, ephemeral=True)
 
 async def discard_team_logic(interaction: discord.Interaction):
     """Logic to discard a team for the Team leader"""
+    await interaction.response.defer(ephemeral=True, thinking=True)
     leader_id = interaction.user.id
-    cursor.execute("SELECT team_name, id FROM teams WHERE leader_id = ?", (leader_id,))
-    team = cursor.fetchone()
+    team = await db.fetch_one("SELECT team_name, id FROM teams WHERE leader_id = ?", (leader_id,))
     if team:
-        team_name, team_id = team
+        team_name, team_id = team['team_name'], team['id']
 
-        cursor.execute("DELETE FROM teams WHERE id = ?", (team_id,))
-        cursor.execute("DELETE FROM members WHERE team_id = ?", (team_id,))
-        conn.commit()
+        async with db.transaction() as conn:
+            await conn.execute("DELETE FROM team_scrims WHERE team_id = ?", (team_id,))
+            await conn.execute("DELETE FROM teams WHERE id = ?", (team_id,))
+            await conn.execute("DELETE FROM members WHERE team_id = ?", (team_id,))
+        invalidate_participants()
 
-        role = discord.utils.get(interaction.guild.roles, name=team_name.upper())
+        role = get_role(interaction.guild, team_name.upper())
         if role:
-            for member in role.members:
-                await member.remove_roles(role)
-                if member.nick and member.nick.startswith(f"{team_name} "):
-                    original_nick = member.nick.split(' ', 1)[-1]
-                    await member.edit(nick=original_nick)
+            limiter = asyncio.Semaphore(5)  # keep within Discord's per-route rate limits
+            await asyncio.gather(*(strip_team_role(member, role, team_name, limiter) for member in role.members))
             await role.delete()
 
-        team_leader_role = discord.utils.get(interaction.guild.roles, name="Team leader")
-        if team_leader_role and team_leader_role in interaction.user.roles:
+        team_leader_role = get_role(interaction.guild, "Team leader")
+        if team_leader_role and interaction.user.get_role(team_leader_role.id):
             await interaction.user.remove_roles(team_leader_role)
 
         if interaction.user.nick and interaction.user.nick.startswith(f"{team_name} "):
@@ -633,32 +713,16 @@ async def discard_team_logic(interaction: discord.Interaction):
             await interaction.user.edit(nick=original_nick)
 
         embed = create_info_embed("Team Discarded", f"Your team '{team_name}' has been discarded.", discord.Color.green())
-        await interaction.response.send_message(embed=embed, ephemeral=True)
+        await interaction.followup.send(embed=embed, ephemeral=True)
     else:
         embed = create_info_embed("Error", "You are not a leader of any team.", discord.Color.red())
-        await interaction.response.send_message(embed=embed, ephemeral=True)
+        await interaction.followup.send(embed=embed, ephemeral=True)
 
 async def participants_logic(interaction: discord.Interaction, day_offset=0):
     """Logic to display all current signed-up teams for a specific scrim day with navigation buttons, limited to a 1-week period"""
-    korean_tz = pytz.timezone('Asia/Seoul')
-    start_date = datetime.now(korean_tz) + timedelta(days=day_offset)
-    scrim_date = start_date.strftime('%d/%m')
-    cursor.execute("SELECT team_name FROM teams WHERE scrim_time = ?", (scrim_date,))
-    teams = [row[0] for row in cursor.fetchall()]
-    embed = discord.Embed(
-        title=f"📋 Participants for {scrim_date}",
-        description="List of teams signed up for the scrim:",
-        color=discord.Color.blue(),
-        timestamp=datetime.now()
-    )
-    if teams:
-        number_emojis = ["1️⃣", "2️⃣", "3️⃣", "4️⃣", "5️⃣", "6️⃣", "7️⃣", "8️⃣", "9️⃣", "🔟", "1️⃣1️⃣", "1️⃣2️⃣"]
-        for index, team in enumerate(teams, start=1):
-            emoji = number_emojis[index - 1] if index <= len(number_emojis) else "🔢"
-            embed.add_field(name=f"{emoji} {team}", value="Signed up", inline=False)
-    else:
-        embed.add_field(name="No Teams", value="None", inline=False)
-    embed.set_footer(text="SV Bot | Daily Participants")
+    # Acknowledge before the lookup so a slow read can't run past Discord's response window
+    await interaction.response.defer()
+    scrim_date = get_scrim_days()[day_offset]
 
     # Add navigation buttons with boundary checks
     view = View()
@@ -668,8 +732,55 @@ async def participants_logic(interaction: discord.Interaction, day_offset=0):
         view.add_item(Button(label="Next Day", style=discord.ButtonStyle.secondary, custom_id=f"participants_next_{day_offset + 1}"))
     view.add_item(Button(label="Back to Menu", style=discord.ButtonStyle.secondary, custom_id="back_to_menu"))
 
+    teams = await get_participants(scrim_date)
+    if teams:
+        lines = [
+            f"{PARTICIPANT_EMOJIS[index] if index < len(PARTICIPANT_EMOJIS) else '🔢'} {team}"
+            for index, team in enumerate(teams)
+        ]
+        description = "List of teams signed up for the scrim:\n" + "\n".join(lines)
+    else:
+        description = "No Teams"
+    embed = discord.Embed(
+        title=f"📋 Participants for {format_scrim_day(scrim_date)}",
+        description=description,
+        color=discord.Color.blue(),
+        timestamp=datetime.now()
+    )
+    embed.set_footer(text="SV Bot | Daily Participants")
+
     # Edit the existing message instead of sending a new one
-    await interaction.response.edit_message(embed=embed, view=view)
+    await interaction.edit_original_response(embed=embed, view=view)
+
+async def category_team_logic(interaction: discord.Interaction):
+    """Logic to open the Team Management buttons"""
+    await interaction.response.edit_message(content="Team Management", embed=None, view=shared_view(TeamView))
+
+async def category_scrim_logic(interaction: discord.Interaction):
+    """Logic to open the Scrim Management buttons"""
+    await interaction.response.edit_message(content="Scrim Management", embed=None, view=shared_view(ScrimView))
+
+async def back_to_menu_logic(interaction: discord.Interaction):
+    """Logic to return to the main menu"""
+    await interaction.response.edit_message(embed=MENU_EMBED, view=shared_view(MenuView))
+
+# --- Interaction Dispatch ---
+# Button custom_id -> handler; on_interaction falls back to prefix checks for dynamic ids
+HANDLERS = {
+    "reset_database": reset_database_logic,
+    "create_team": create_team_logic,
+    "join_team": join_team_logic,
+    "check_teams": check_teams_logic,
+    "quit_team": quit_team_logic,
+    "scrim_signup": scrim_signup_logic,
+    "cancel_sign_up": cancel_sign_up_logic,
+    "check_schedule": check_schedule_logic,
+    "discard_team": discard_team_logic,
+    "participants": participants_logic,
+    "category_team": category_team_logic,
+    "category_scrim": category_scrim_logic,
+    "back_to_menu": back_to_menu_logic,
+}
 
 # --- Run the Bot ---
 bot.run(TOKEN)
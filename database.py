@@ -1,97 +1,290 @@
 import aiosqlite
 from contextlib import asynccontextmanager
 import asyncio
-from typing import Optional, List, Tuple, Any
+import weakref
+from pathlib import Path
+from typing import Optional, List, Tuple, Any, AsyncIterator
+
+# Applied once to every connection when it is opened
+CONNECTION_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "temp_store": "MEMORY",
+    "cache_size": -65536,  # 64MB page cache
+    "mmap_size": 268435456,  # read pages through a 256MB mmap instead of pread()
+}
+PRAGMA_SCRIPT = "\n".join(f"PRAGMA {name}={value};" for name, value in CONNECTION_PRAGMAS.items())
+# Prepared statements kept per connection, keyed by SQL text (sqlite3 defaults to 128)
+STATEMENT_CACHE_SIZE = 256
+
+async def open_connection(db_path: str, read_only: bool = False) -> aiosqlite.Connection:
+    if read_only:
+        db = await aiosqlite.connect(f"{Path(db_path).absolute().as_uri()}?mode=ro", uri=True, cached_statements=STATEMENT_CACHE_SIZE)
+    else:
+        db = await aiosqlite.connect(db_path, cached_statements=STATEMENT_CACHE_SIZE)
+    db.row_factory = aiosqlite.Row
+    await db.executescript(PRAGMA_SCRIPT)
+    return db
+
+class SqlitePool:
+    """Fixed-size pool of long-lived aiosqlite connections."""
+
+    def __init__(self, db_path: str, size: int, read_only: bool = False):
+        self.db_path = db_path
+        self.size = size
+        self.read_only = read_only
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._connections: List[aiosqlite.Connection] = []
+
+    @property
+    def is_open(self) -> bool:
+        return bool(self._connections)
+
+    async def open(self):
+        for _ in range(self.size):
+            db = await open_connection(self.db_path, self.read_only)
+            self._connections.append(db)
+            self._queue.put_nowait(db)
+
+    async def close(self):
+        for db in self._connections:
+            await db.close()
+        self._connections.clear()
+        self._queue = asyncio.Queue()
+
+    @asynccontextmanager
+    async def acquire(self):
+        db = await self._queue.get()
+        try:
+            yield db
+        finally:
+            self._queue.put_nowait(db)
 
 class DatabaseManager:
-    def __init__(self, db_path: str):
+    def __init__(self, db_path: str, readers: int = 4):
         self.db_path = db_path
-        self._locks = {}
+        # Entries vanish once no caller holds the lock, so idle lock ids don't pile up
+        self._locks = weakref.WeakValueDictionary()
+        # A single writer connection serializes INSERT/DELETE; SELECTs go to the read-only
+        # readers, which WAL lets run alongside the writer.
+        self._writer = SqlitePool(db_path, 1)
+        self._readers = SqlitePool(db_path, readers, read_only=True)
+
+    async def connect(self):
+        if self._writer.is_open:
+            return
+        await self._writer.open()
+        await self._readers.open()
+
+    async def close(self):
+        await self._readers.close()
+        await self._writer.close()
 
     @asynccontextmanager
     async def get_connection(self):
-        async with aiosqlite.connect(self.db_path) as db:
-            db.row_factory = aiosqlite.Row
+        async with self._writer.acquire() as db:
             yield db
 
     async def execute(self, query: str, params: Optional[tuple] = None) -> Any:
         async with self.get_connection() as db:
-            async with db.cursor() as cursor:
-                await cursor.execute(query, params or ())
-                await db.commit()
-                return cursor
+            try:
+                async with db.execute(query, params or ()) as cursor:
+                    await db.commit()
+                    return cursor
+            except BaseException:
+                # A failed statement leaves sqlite3's implicit transaction open on the shared writer
+                if db.in_transaction:
+                    await db.rollback()
+                raise
 
-    async def fetch_one(self, query: str, params: Optional[tuple] = None) -> Optional[dict]:
+    async def execute_script(self, script: str):
+        # executescript() commits any open transaction first, so the script carries its own
         async with self.get_connection() as db:
-            async with db.cursor() as cursor:
-                await cursor.execute(query, params or ())
+            try:
+                await db.executescript(f"BEGIN IMMEDIATE;\n{script}\nCOMMIT;")
+            except BaseException:
+                if db.in_transaction:
+                    await db.rollback()
+                raise
+
+    async def fetch_one(self, query: str, params: Optional[tuple] = None) -> Optional[dict]:
+        async with self._readers.acquire() as db:
+            async with db.execute(query, params or ()) as cursor:
                 result = await cursor.fetchone()
                 return dict(result) if result else None
 
     async def fetch_all(self, query: str, params: Optional[tuple] = None) -> List[dict]:
-        async with self.get_connection() as db:
-            async with db.cursor() as cursor:
-                await cursor.execute(query, params or ())
+        async with self._readers.acquire() as db:
+            async with db.execute(query, params or ()) as cursor:
                 results = await cursor.fetchall()
                 return [dict(row) for row in results]
 
-    async def acquire_lock(self, lock_id: str) -> asyncio.Lock:
-        if lock_id not in self._locks:
-            self._locks[lock_id] = asyncio.Lock()
-        return await self._locks[lock_id].acquire()
+    async def fetch_iter(self, query: str, params: Optional[tuple] = None) -> AsyncIterator[aiosqlite.Row]:
+        async with self._readers.acquire() as db:
+            async with db.execute(query, params or ()) as cursor:
+                async for row in cursor:
+                    yield row
+
+    async def fetch_column(self, query: str, params: Optional[tuple] = None, col: int = 0) -> List[Any]:
+        # Single-column reads skip the per-row dict that fetch_all builds
+        return [row[col] async for row in self.fetch_iter(query, params)]
 
-    def release_lock(self, lock_id: str):
-        if lock_id in self._locks:
-            self._locks[lock_id].release()
+    def _get_lock(self, lock_id: str) -> asyncio.Lock:
+        # No await between lookup and insert, so concurrent callers always share one lock
+        lock = self._locks.get(lock_id)
+        if lock is None:
+            lock = self._locks.setdefault(lock_id, asyncio.Lock())
+        return lock
+
+    @asynccontextmanager
+    async def lock(self, lock_id: str):
+        lock = self._get_lock(lock_id)
+        async with lock:
+            yield
 
+    @asynccontextmanager
     async def transaction(self):
+        # Holding the only writer connection serializes transactions; IMMEDIATE takes
+        # SQLite's write lock up front instead of upgrading to it mid-transaction
         async with self.get_connection() as db:
-            async with db.cursor() as cursor:
-                await cursor.execute("BEGIN TRANSACTION")
-                try:
-                    yield cursor
-                    await db.commit()
-                except Exception as e:
+            await db.execute("BEGIN IMMEDIATE")
+            try:
+                yield db
+                await db.commit()
+            except BaseException:
+                # Includes cancellation, which must not hand the writer back mid-transaction
+                if db.in_transaction:
                     await db.rollback()
-                    raise e
+                raise
+
+TEAMS_TABLE = """
+    CREATE TABLE IF NOT EXISTS {name} (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        team_name TEXT UNIQUE NOT NULL,
+        leader_id INTEGER,
+        FOREIGN KEY (leader_id) REFERENCES members(id)
+    )
+"""
+
+SCRIMS_TABLE = """
+    CREATE TABLE IF NOT EXISTS {name} (
+        time_period TEXT PRIMARY KEY
+    ) WITHOUT ROWID
+"""
+
+# One row per team per signed-up day
+TEAM_SCRIMS_TABLE = """
+    CREATE TABLE IF NOT EXISTS {name} (
+        team_id INTEGER,
+        scrim_time INTEGER,  -- days since 1970-01-01
+        PRIMARY KEY (team_id, scrim_time),
+        FOREIGN KEY (team_id) REFERENCES teams(id)
+    ) WITHOUT ROWID
+"""
+
+async def rebuild_without_rowid(cursor, table: str, table_sql: str, columns: str):
+    """Recreate a table created before it became WITHOUT ROWID, keeping its rows"""
+    await cursor.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (table,))
+    row = await cursor.fetchone()
+    if row is None or "WITHOUT ROWID" in row[0].upper():
+        return
+    await cursor.execute(table_sql.format(name=f"{table}_new"))
+    await cursor.execute(f"INSERT OR IGNORE INTO {table}_new ({columns}) SELECT {columns} FROM {table}")
+    await cursor.execute(f"DROP TABLE {table}")
+    await cursor.execute(f"ALTER TABLE {table}_new RENAME TO {table}")
+
+# A legacy 'DD/MM' scrim_time placed in the current KST year
+LEGACY_SCRIM_DATE = "strftime('%Y', 'now', '+9 hours') || '-' || substr(scrim_time, 4, 2) || '-' || substr(scrim_time, 1, 2)"
+# Signups only ever covered today through today+6, so no stored day lies past this
+SIGNUP_HORIZON = "date('now', '+9 hours', '+6 days')"
+
+# Day number for a legacy scrim_time: the latest date with that day and month not after the
+# signup horizon. Date arithmetic silently rolls impossible dates over ('31/04' -> 05-01), so
+# those and anything unparseable come out NULL instead.
+SCRIM_DAY_FROM_TEXT = f"""
+    CAST(julianday(CASE
+            WHEN date({LEGACY_SCRIM_DATE}, '+0 days') IS NOT {LEGACY_SCRIM_DATE} THEN NULL
+            WHEN {LEGACY_SCRIM_DATE} > {SIGNUP_HORIZON} THEN date({LEGACY_SCRIM_DATE}, '-1 year')
+            WHEN date({LEGACY_SCRIM_DATE}, '+1 year') <= {SIGNUP_HORIZON} THEN date({LEGACY_SCRIM_DATE}, '+1 year')
+            ELSE {LEGACY_SCRIM_DATE}
+        END) - 2440587.5 AS INTEGER)
+"""
+
+async def migrate_team_scrims(cursor):
+    """Move the per-day rows older databases kept in teams into team_scrims"""
+    await cursor.execute("PRAGMA table_info(teams)")
+    if "scrim_time" not in [row[1] for row in await cursor.fetchall()]:
+        return
+    # Members and leader lookups always resolved to a team's first row, so that row's id is kept
+    await cursor.execute(f"""
+        INSERT OR IGNORE INTO team_scrims (team_id, scrim_time)
+        SELECT (SELECT MIN(id) FROM teams AS first WHERE first.team_name = teams.team_name), {SCRIM_DAY_FROM_TEXT}
+        FROM teams
+        WHERE team_name IS NOT NULL AND {SCRIM_DAY_FROM_TEXT} IS NOT NULL
+    """)
+    await cursor.execute(TEAMS_TABLE.format(name="teams_new"))
+    await cursor.execute("""
+        INSERT INTO teams_new (id, team_name, leader_id)
+        SELECT MIN(id), team_name, leader_id FROM teams WHERE team_name IS NOT NULL GROUP BY team_name
+    """)
+    await cursor.execute("DROP TABLE teams")
+    await cursor.execute("ALTER TABLE teams_new RENAME TO teams")
+
+async def migrate_scrim_days(cursor):
+    """Rebuild team_scrims with integer day numbers if it still stores 'DD/MM' text"""
+    await cursor.execute("PRAGMA table_info(team_scrims)")
+    if any(row[1] == "scrim_time" and row[2].upper() == "INTEGER" for row in await cursor.fetchall()):
+        return
+    await cursor.execute(TEAM_SCRIMS_TABLE.format(name="team_scrims_new"))
+    await cursor.execute(f"""
+        INSERT OR IGNORE INTO team_scrims_new (team_id, scrim_time)
+        SELECT team_id, {SCRIM_DAY_FROM_TEXT} FROM team_scrims
+        WHERE {SCRIM_DAY_FROM_TEXT} IS NOT NULL
+    """)
+    await cursor.execute("DROP TABLE team_scrims")
+    await cursor.execute("ALTER TABLE team_scrims_new RENAME TO team_scrims")
+
+MEMBERS_TABLE = """
+    CREATE TABLE IF NOT EXISTS members (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        team_id INTEGER,
+        member_name TEXT,
+        FOREIGN KEY (team_id) REFERENCES teams(id)
+    )
+"""
+
+TABLES_SCRIPT = ";\n".join([
+    SCRIMS_TABLE.format(name="scrims"),
+    TEAMS_TABLE.format(name="teams"),
+    MEMBERS_TABLE,
+    TEAM_SCRIMS_TABLE.format(name="team_scrims"),
+]) + ";"
+
+# Runs after the migrations so the indexes land on the final table layouts
+INDEXES_SCRIPT = """
+    -- UNIQUE team_name and the time_period primary key already provide these indexes
+    DROP INDEX IF EXISTS idx_teams_team_name;
+    DROP INDEX IF EXISTS idx_scrims_time_period;
+    -- (scrim_time, team_id) answers the per-day participant lookups from the index alone
+    DROP INDEX IF EXISTS idx_team_scrims_scrim_time;
+    CREATE INDEX IF NOT EXISTS idx_team_scrims_time_team ON team_scrims(scrim_time, team_id);
+    CREATE INDEX IF NOT EXISTS idx_teams_leader_id ON teams(leader_id);
+    -- (member_name, team_id) covers the name -> team lookups and replaces the name-only index
+    DROP INDEX IF EXISTS idx_members_member_name;
+    CREATE INDEX IF NOT EXISTS idx_members_name_team ON members(member_name, team_id);
+    -- (team_id, member_name) lists a team's members from the index alone
+    DROP INDEX IF EXISTS idx_members_team_id;
+    CREATE INDEX IF NOT EXISTS idx_members_team_member ON members(team_id, member_name);
+"""
 
 # Initialize database tables
 async def init_db(db_path: str):
     async with aiosqlite.connect(db_path) as db:
+        await db.executescript(PRAGMA_SCRIPT + TABLES_SCRIPT)
         async with db.cursor() as cursor:
-            # Create scrims table
-            await cursor.execute("""
-                CREATE TABLE IF NOT EXISTS scrims (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    time_period TEXT UNIQUE
-                )
-            """)
-            
-            # Create teams table
-            await cursor.execute("""
-                CREATE TABLE IF NOT EXISTS teams (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    team_name TEXT UNIQUE,
-                    scrim_time TEXT,
-                    leader_id INTEGER,
-                    FOREIGN KEY (leader_id) REFERENCES members(id)
-                )
-            """)
-            
-            # Create members table
-            await cursor.execute("""
-                CREATE TABLE IF NOT EXISTS members (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    team_id INTEGER,
-                    member_name TEXT,
-                    FOREIGN KEY (team_id) REFERENCES teams(id)
-                )
-            """)
-            
-            # Add indexes
-            await cursor.execute("CREATE INDEX IF NOT EXISTS idx_scrims_time_period ON scrims(time_period)")
-            await cursor.execute("CREATE INDEX IF NOT EXISTS idx_teams_team_name ON teams(team_name)")
-            await cursor.execute("CREATE INDEX IF NOT EXISTS idx_teams_scrim_time ON teams(scrim_time)")
-            await cursor.execute("CREATE INDEX IF NOT EXISTS idx_members_member_name ON members(member_name)")
-            
-            await db.commit() 
\ No newline at end of file
+            await migrate_team_scrims(cursor)
+            await migrate_scrim_days(cursor)
+            await rebuild_without_rowid(cursor, "scrims", SCRIMS_TABLE, "time_period")
+            await rebuild_without_rowid(cursor, "team_scrims", TEAM_SCRIMS_TABLE, "team_id, scrim_time")
+        await db.commit()
+        await db.executescript(INDEXES_SCRIPT)